@@ -1,17 +1,8 @@
 import streamlit as st
-import json
-import os
-from dotenv import load_dotenv
-import re
-from datetime import datetime
-from openai import OpenAI
-import glob
-
-# Load environment variables
-load_dotenv()
-
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+import time
+from clients import get_openai_client
+from context_packs import ContextPacks, count_tokens
+from ticker_index import TickerIndex
 
 # --- Styling ---
 st.set_page_config(page_title="📈 Financial News Assistant", layout="centered")
@@ -180,33 +171,32 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-def get_latest_scraped_data():
-    """Get the most recent scraped data file from the finance_data directory."""
-    data_dir = "finance_data"
-    if not os.path.exists(data_dir):
-        return None
-    
-    # Get all JSON files in the finance_data directory
-    files = glob.glob(os.path.join(data_dir, "finance_articles_*.json"))
-    if not files:
-        return None
-    
-    # Get the most recent file based on timestamp in filename
-    latest_file = max(files, key=os.path.getctime)
-    return latest_file
+# Hard ceiling on article context per question (gpt-3.5-turbo has a 4k window)
+CONTEXT_TOKEN_BUDGET = 2500
 
-def load_latest_articles():
-    """Load the most recent scraped articles."""
-    latest_file = get_latest_scraped_data()
-    if not latest_file:
-        return None
-    
-    try:
-        with open(latest_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading articles: {e}")
-        return None
+@st.cache_resource
+def get_ticker_index():
+    """Load the ticker index once per server process."""
+    return TickerIndex("finance_data")
+
+@st.cache_resource
+def get_context_packs():
+    """Load the precomputed context packs once per server process, sharing the ticker index."""
+    return ContextPacks("finance_data", index=get_ticker_index())
+
+def get_ticker_stats(prompt):
+    """Short mention-count line for each ticker named in the prompt, or None."""
+    index = get_ticker_index()
+    # The crawler owns the index file; the app only reloads it after a crawl saves
+    index.reload_if_changed()
+    stats = []
+    for ticker in index.tickers_in_text(prompt):
+        co_mentions = ", ".join(t for t, _ in index.co_mentioned(ticker))
+        stats.append(
+            f"{ticker}: mentioned in {index.mention_count(ticker)} articles"
+            + (f", often alongside {co_mentions}" if co_mentions else "")
+        )
+    return "\n".join(stats) or None
 
 # --- Title & Instructions ---
 st.markdown('<div class="title">📊 Financial News Assistant</div>', unsafe_allow_html=True)
@@ -219,23 +209,29 @@ prompt = st.text_input("🗣️ Enter your question:")
 if st.button("🚀 Submit"):
     if prompt:
         try:
-            # Load existing articles
-            articles = load_latest_articles()
-            if not articles:
+            # Ticker stats count against the same token ceiling as the article packs
+            ticker_stats = get_ticker_stats(prompt)
+            stats_block = f"Ticker mentions across all crawls:\n{ticker_stats}\n\n" if ticker_stats else ""
+            stats_tokens = count_tokens(stats_block)
+
+            # Assemble context from ready-made packs, preferring tickers and topics in the question
+            packs = get_context_packs()
+            # The crawler owns the packs file; the app only reloads it after a crawl saves
+            packs.reload_if_changed()
+            start = time.perf_counter()
+            context, context_tokens, article_ids = packs.assemble(
+                prompt, CONTEXT_TOKEN_BUDGET - stats_tokens)
+            assemble_us = (time.perf_counter() - start) * 1e6
+            if not article_ids:
                 st.error("❌ No articles found. Please wait for the next scheduled crawl.")
                 st.stop()
-
-            # Create context from existing articles
-            context = "\n\n".join([
-                f"Title: {article.get('title', '')}\n"
-                f"Content: {article.get('content', '')}\n"
-                f"URL: {article.get('url', '')}\n"
-                for article in articles
-            ])
+            context = stats_block + context
+            st.caption(f"📚 Context: {len(article_ids)} articles, {stats_tokens + context_tokens} tokens, "
+                       f"assembled in {assemble_us:.0f} µs")
 
             # Generate response using existing data
             try:
-                response = client.chat.completions.create(
+                response = get_openai_client().chat.completions.create(
                     model="gpt-3.5-turbo",
                     messages=[
                         {"role": "system", "content": """You are a financial news expert. 
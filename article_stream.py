@@ -0,0 +1,250 @@
+import glob
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: streams are not locked, so run a single crawler at a time
+    fcntl = None
+
+# Last line of a finished stream. Readers treat a stream without it as still
+# in progress (or interrupted, in which case the next crawl resumes it).
+COMPLETE_KEY = "_crawl_complete"
+# The marker line is far shorter than this, so is_complete only reads the file's tail
+MARKER_SEARCH_BYTES = 4096
+
+
+class StreamLockedError(Exception):
+    """Raised when another process is already writing a stream."""
+
+
+def _scan(path):
+    """Read a JSONL stream and return (articles, complete, committed_bytes).
+
+    Only newline-terminated lines count as committed; a torn last line from a
+    crash is ignored and everything from it onwards is excluded from the byte count.
+    """
+    articles = []
+    complete = False
+    committed = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            committed += len(line)
+            if isinstance(record, dict) and record.get(COMPLETE_KEY):
+                complete = True
+                break
+            articles.append(record)
+    return articles, complete, committed
+
+
+def iter_articles(path):
+    """Yield committed articles from a JSONL stream without loading it all at once."""
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                return
+            try:
+                record = json.loads(line)
+            except ValueError:
+                return
+            if isinstance(record, dict) and record.get(COMPLETE_KEY):
+                return
+            yield record
+
+
+def completion_marker(path):
+    """The crawl-complete marker record of a stream, or None if it has none.
+
+    Only the end of the file is read, since the marker is always the last line.
+    """
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - MARKER_SEARCH_BYTES))
+            data = f.read()
+    except OSError:
+        return None
+    if not data.endswith(b'\n'):
+        return None
+    try:
+        record = json.loads(data.rstrip(b'\n').rsplit(b'\n', 1)[-1])
+    except ValueError:
+        return None
+    if isinstance(record, dict) and record.get(COMPLETE_KEY):
+        return record
+    return None
+
+
+def is_complete(path):
+    """True if a stream carries the crawl-complete marker (plain JSON snapshots always do)."""
+    if not path.endswith(".jsonl"):
+        return True
+    return completion_marker(path) is not None
+
+
+def load_articles(path):
+    """Load articles from either a JSON snapshot or a JSONL stream."""
+    if path.endswith(".jsonl"):
+        return list(iter_articles(path))
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def tail(path, poll_interval=1.0, timeout=None):
+    """Follow a stream as it is written, yielding each article once it is committed.
+
+    Waits for the file to appear. Stops at the crawl-complete marker, or after
+    `timeout` seconds without new data. Like the other readers it never yields
+    a torn line; a corrupt line is skipped.
+    """
+    # Only whole lines move the offset, so a torn line is read again on the next
+    # poll; a resumed writer truncates exactly back to this point before appending
+    offset = 0
+    idle_since = time.monotonic()
+    while True:
+        try:
+            with open(path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() < offset:
+                    # The file was truncated below what we already read; continue from its end
+                    offset = f.tell()
+                f.seek(offset)
+                chunk = f.read()
+        except FileNotFoundError:
+            chunk = b''
+        end = chunk.rfind(b'\n') + 1
+        if end:
+            offset += end
+            idle_since = time.monotonic()
+            for line in chunk[:end].split(b'\n'):
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and record.get(COMPLETE_KEY):
+                    return
+                yield record
+        elif timeout is not None and time.monotonic() - idle_since > timeout:
+            return
+        else:
+            time.sleep(poll_interval)
+
+
+def incomplete_streams(output_dir, prefix="finance_articles"):
+    """Streams in `output_dir` that never got their crawl-complete marker, newest first."""
+    streams = sorted(glob.glob(os.path.join(output_dir, f"{prefix}_*.jsonl")), reverse=True)
+    return [path for path in streams if not is_complete(path)]
+
+
+def find_incomplete_stream(output_dir, prefix="finance_articles"):
+    """Most recent stream in `output_dir` that never got its crawl-complete marker."""
+    streams = incomplete_streams(output_dir, prefix)
+    return streams[0] if streams else None
+
+
+class ArticleStreamWriter:
+    """Append-only JSONL writer that persists each article as soon as it is ready.
+
+    Lines are flushed immediately and fsynced every `fsync_every` articles.
+    Opening an existing, unfinished stream drops any torn last line and
+    continues after the last committed article. The writer holds an exclusive
+    lock on the file while open, so two crawlers never append to one stream.
+    """
+
+    def __init__(self, path, fsync_every=5):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.committed_urls = set()
+        self.count = 0
+        self._unsynced = 0
+
+        self._file = open(path, 'a', encoding='utf-8')
+        if fcntl:
+            try:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._file.close()
+                raise StreamLockedError(f"Stream is being written by another process: {path}")
+
+        articles, complete, committed = _scan(path)
+        if complete:
+            self._file.close()
+            raise ValueError(f"Stream already complete: {path}")
+        os.truncate(path, committed)
+        self.count = len(articles)
+        self.committed_urls = {a.get('url') for a in articles if a.get('url')}
+        if self.count:
+            print(f"Resuming crawl from {path} ({self.count} articles already committed)")
+
+    @classmethod
+    def resume_or_create(cls, output_dir, prefix="finance_articles", **kwargs):
+        """Resume the latest interrupted stream in `output_dir`, or start a new one.
+
+        Streams locked by another running crawler are left alone.
+        """
+        for path in incomplete_streams(output_dir, prefix):
+            try:
+                return cls(path, **kwargs)
+            except (StreamLockedError, ValueError):
+                continue
+
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(output_dir, f"{prefix}_{timestamp}.jsonl")
+        suffix = 1
+        while True:
+            if not os.path.exists(path):
+                try:
+                    return cls(path, **kwargs)
+                except StreamLockedError:
+                    # Another crawler created this name at the same moment
+                    pass
+            # Otherwise a finished crawl already used this second
+            path = os.path.join(output_dir, f"{prefix}_{timestamp}_{suffix}.jsonl")
+            suffix += 1
+
+    def is_committed(self, url):
+        """True if an article with this URL is already in the stream."""
+        return url in self.committed_urls
+
+    def append(self, article):
+        """Write one article as a single JSONL line."""
+        self._file.write(json.dumps(article, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.count += 1
+        if article.get('url'):
+            self.committed_urls.add(article['url'])
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self.sync()
+
+    def sync(self):
+        """Force buffered lines to disk."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def complete(self):
+        """Append the crawl-complete marker, sync and close the stream."""
+        self._file.write(json.dumps({
+            COMPLETE_KEY: True,
+            'articles': self.count,
+            'completed_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        }) + "\n")
+        self.close()
+
+    def close(self):
+        """Sync and close without marking the crawl complete."""
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
@@ -0,0 +1,78 @@
+"""Prompt-context benchmark: raw article content vs precomputed context packs.
+
+Compares prompt tokens and context build latency per question for the old
+approach (every article's full content from the latest crawl) and for
+ContextPacks.assemble under the app's token ceiling. Packs are built from a
+temporary copy of the crawls, so nothing under finance_data is modified.
+Periods such as "this week" are measured from the newest article, not the clock.
+Run with `python bench_context.py [data_dir]`.
+"""
+import glob
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from article_stream import load_articles
+from context_packs import ContextPacks, count_tokens
+from ticker_index import SNAPSHOT_PATTERNS, TickerIndex
+
+QUESTIONS = [
+    "What's the news on TXN this week?",
+    "Why is NVDA moving today?",
+    "How is the stock market reacting to tariffs?",
+    "Which ETF flows stood out recently?",
+]
+TOKEN_BUDGET = 2500
+RUNS = 200
+
+
+def raw_context(data_dir):
+    """Context as app.py used to build it: full content of every article in the latest crawl."""
+    files = [p for pattern in SNAPSHOT_PATTERNS for p in glob.glob(os.path.join(data_dir, pattern))]
+    articles = load_articles(max(files, key=os.path.getctime))
+    return "\n\n".join([
+        f"Title: {article.get('title', '')}\n"
+        f"Content: {article.get('content', '')}\n"
+        f"URL: {article.get('url', '')}\n"
+        for article in articles
+    ])
+
+
+def main():
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else "finance_data"
+
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        context = raw_context(data_dir)
+    raw_us = (time.perf_counter() - start) / RUNS * 1e6
+    raw_tokens = count_tokens(context)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for pattern in SNAPSHOT_PATTERNS:
+            for path in glob.glob(os.path.join(data_dir, pattern)):
+                shutil.copy(path, tmp_dir)
+        start = time.perf_counter()
+        index = TickerIndex(tmp_dir)
+        index.update()
+        packs = ContextPacks(tmp_dir, index=index)
+        packs.update()
+        build_ms = (time.perf_counter() - start) * 1e3
+    print(f"Built ticker index and {len(packs.entries)} pack entries from {len(packs.snapshots)} crawls "
+          f"in {build_ms:.1f} ms (crawl time)")
+    print(f"Raw content (latest crawl only): {raw_tokens} tokens, {raw_us:.0f} µs per question\n")
+
+    # Stored timestamps are naive UTC
+    now = datetime.fromisoformat(packs.latest[-1][0]).replace(tzinfo=timezone.utc) if packs.latest else None
+    print(f"{'question':<48} {'articles':>8} {'tokens':>7} {'assemble':>10}")
+    for question in QUESTIONS:
+        start = time.perf_counter()
+        for _ in range(RUNS):
+            context, tokens, ids = packs.assemble(question, TOKEN_BUDGET, now=now)
+        assemble_us = (time.perf_counter() - start) / RUNS * 1e6
+        print(f"{question:<48} {len(ids):>8} {tokens:>7} {assemble_us:>8.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
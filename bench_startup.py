@@ -0,0 +1,40 @@
+"""Import-time benchmark for the project's entry-point modules.
+
+Each module is imported in a fresh interpreter so the numbers reflect a cold
+start. Run with `python bench_startup.py [runs]`.
+"""
+import statistics
+import subprocess
+import sys
+
+MODULES = ["keyword_extract", "crawler", "ticker_index", "main", "scheduler", "app"]
+
+
+def time_import(module, runs):
+    """Median wall-clock seconds to import `module` in a new interpreter, or None on failure."""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+            print(f"{module:<16} failed: {error}")
+            return None
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"Median import time over {runs} cold runs:")
+    for module in MODULES:
+        seconds = time_import(module, runs)
+        if seconds is not None:
+            print(f"{module:<16} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import os
+
+# Shared, lazily created clients. Nothing heavy is imported until first use,
+# and a long-running process (see worker.py) keeps them warm between jobs.
+_env_loaded = False
+_openai_client = None
+_http_session = None
+
+
+def load_env():
+    """Load variables from .env once per process."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def get_openai_client():
+    """Return the shared OpenAI client, creating it on first use."""
+    global _openai_client
+    if _openai_client is None:
+        load_env()
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY not found in environment variables. Please check your .env file.")
+        from openai import OpenAI
+        _openai_client = OpenAI(api_key=api_key)
+    return _openai_client
+
+
+def get_http_session():
+    """Return the shared requests session so connections are reused across crawls."""
+    global _http_session
+    if _http_session is None:
+        import requests
+        _http_session = requests.Session()
+    return _http_session
@@ -0,0 +1,309 @@
+import glob
+import json
+import os
+import re
+from bisect import insort
+from article_stream import is_complete, load_articles
+from ticker_index import (SNAPSHOT_PATTERNS, article_id, find_tickers, get_index, normalize_timestamp,
+                          save_json_atomic, slice_postings, snapshot_timestamp, time_window)
+
+PACKS_FILENAME = "context_packs.json"
+# Bump when build_pack_text changes, so the next update rebuilds every entry's text
+PACKS_FORMAT = 2
+# cl100k_base is the encoding used by gpt-3.5-turbo
+TOKENIZER_ENCODING = "cl100k_base"
+MAX_PACK_TICKERS = 8
+MAX_FALLBACK_SUMMARY_CHARS = 160
+ENTRY_SEPARATOR = "\n\n"
+# No entry is smaller than this, so assembly stops once less than it remains
+MIN_ENTRY_TOKENS = 16
+
+_encoding = None
+# Words as topics and questions are matched: '&', '.', "'" and '-' may join parts, e.g. "s&p"
+_WORD_RE = re.compile(r"[a-z0-9]+(?:[&.'-][a-z0-9]+)*")
+
+
+def count_tokens(text):
+    """Count tokens with the local tiktoken tokenizer, loaded on first use.
+
+    tiktoken is required: the token ceiling is only as good as these counts.
+    """
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+        except ImportError:
+            raise RuntimeError("tiktoken is required for context packs. Install it with `pip install tiktoken`.")
+        _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+    return len(_encoding.encode(text))
+
+
+def parse_topics(keywords):
+    """Topic names from the scheduler's 'Keywords: a, b, c' analysis text."""
+    if not keywords:
+        return []
+    match = re.search(r'Keywords:\s*\[?([^\]\n]*)', keywords, re.IGNORECASE)
+    if not match:
+        return []
+    topics = []
+    for keyword in match.group(1).split(','):
+        topic = keyword.strip().strip('"\'').lower()
+        if topic and topic not in topics:
+            topics.append(topic)
+    return topics
+
+
+def topic_key(text):
+    """Normalized form of a topic or phrase, used to find topics named in a question."""
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def first_sentence(text, max_chars=MAX_FALLBACK_SUMMARY_CHARS):
+    """First sentence of `text`, cut at a word boundary if it is longer than `max_chars`."""
+    sentence = re.split(r'(?<=[.!?])\s', " ".join(text.split()), maxsplit=1)[0]
+    if len(sentence) > max_chars:
+        sentence = sentence[:max_chars].rsplit(' ', 1)[0] + "…"
+    return sentence
+
+
+def build_pack_text(article):
+    """Compact prompt text for one article: headline, summary, tickers and URL."""
+    summary = article.get('summary')
+    if not summary:
+        # Older snapshots have no summary, so fall back to the content's lead sentence
+        summary = first_sentence(article.get('content') or '')
+    lines = [f"Title: {article.get('title', '')}", f"Summary: {summary}"]
+    tickers = (article.get('mentioned_tickers') or [])[:MAX_PACK_TICKERS]
+    if tickers:
+        lines.append(f"Tickers: {', '.join(tickers)}")
+    lines.append(f"URL: {article.get('url', '')}")
+    return "\n".join(lines)
+
+
+class ContextPacks:
+    """Token-counted prompt snippets for every crawled article, built at crawl time.
+
+    Each article becomes one pack entry with its token cost precomputed. Entries
+    are sharded by topic (from the scheduler's keywords) and ranked newest first;
+    ticker shards come straight from the TickerIndex postings. The app only has
+    to pick entries from the shards a question names until the token budget runs out.
+    """
+
+    def __init__(self, data_dir="finance_data", index=None):
+        self.data_dir = data_dir
+        self.packs_path = os.path.join(data_dir, PACKS_FILENAME)
+        self.index = index or get_index(data_dir)
+        self.entries = {}   # article_id -> {'text', 'tokens', 'timestamp', 'topics'}
+        self.topics = {}    # topic -> sorted [[timestamp, article_id], ...]
+        self.latest = []    # every entry, sorted [[timestamp, article_id], ...]
+        self.snapshots = []
+        self.separator_tokens = count_tokens(ENTRY_SEPARATOR)
+        self._mtime = None
+        self._topic_keys = None   # topic_key(phrase) -> topic, rebuilt when topics change
+        self._max_topic_words = 0
+        self.load()
+
+    def load(self):
+        """Load persisted packs, starting empty if they are missing or unreadable."""
+        self._topic_keys = None
+        if not os.path.exists(self.packs_path):
+            return
+        try:
+            self._mtime = os.path.getmtime(self.packs_path)
+            with open(self.packs_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.entries = data.get('entries', {})
+            self.topics = data.get('topics', {})
+            self.latest = data.get('latest', [])
+            self.snapshots = data.get('snapshots', [])
+        except Exception as e:
+            print(f"Error loading context packs, rebuilding: {e}")
+            self.entries, self.topics, self.latest, self.snapshots = {}, {}, [], []
+            return
+
+        if data.get('tokenizer') != TOKENIZER_ENCODING:
+            # Counts from another tokenizer can't enforce the budget, so redo them
+            print(f"Recounting context pack tokens with {TOKENIZER_ENCODING}")
+            for entry in self.entries.values():
+                entry['tokens'] = count_tokens(entry['text']) + self.separator_tokens
+
+        if data.get('format') != PACKS_FORMAT:
+            # Entries stay usable, but the next update rebuilds their text from the crawls
+            print("Context packs are from an older format; the next update rebuilds them")
+            self.snapshots = []
+
+    def reload_if_changed(self):
+        """Reload the packs if a crawl saved them since they were loaded.
+
+        This is how read-only users such as the app pick up new crawls.
+        """
+        try:
+            mtime = os.path.getmtime(self.packs_path)
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self.load()
+        return True
+
+    def save(self):
+        """Persist the packs atomically, recording which tokenizer counted them."""
+        try:
+            save_json_atomic(self.packs_path, {
+                'format': PACKS_FORMAT,
+                'tokenizer': TOKENIZER_ENCODING,
+                'snapshots': self.snapshots,
+                'entries': self.entries,
+                'topics': self.topics,
+                'latest': self.latest,
+            })
+            self._mtime = os.path.getmtime(self.packs_path)
+        except Exception as e:
+            print(f"Error saving context packs: {e}")
+
+    def add_snapshot(self, path):
+        """Build pack entries for one crawl snapshot. Returns the number of entries written."""
+        name = os.path.basename(path)
+        if name in self.snapshots:
+            return 0
+
+        try:
+            articles = load_articles(path)
+        except Exception as e:
+            print(f"Error building context packs from {path}: {e}")
+            return 0
+
+        crawled_at = snapshot_timestamp(path)
+        written = 0
+        for article in articles or []:
+            url = article.get('url')
+            if not url:
+                continue
+            aid = article_id(url)
+            entry = self.entries.get(aid)
+            if entry is None:
+                entry = {
+                    'timestamp': normalize_timestamp(article.get('published_date')) or crawled_at,
+                    'topics': [],
+                }
+                self.entries[aid] = entry
+                insort(self.latest, [entry['timestamp'], aid])
+
+            # Newer crawls may add a summary, so always take the latest text
+            text = build_pack_text(article)
+            entry['text'] = text
+            entry['tokens'] = count_tokens(text) + self.separator_tokens
+            written += 1
+
+            for topic in parse_topics(article.get('keywords')):
+                if topic not in entry['topics']:
+                    entry['topics'].append(topic)
+                    insort(self.topics.setdefault(topic, []), [entry['timestamp'], aid])
+
+        self._topic_keys = None
+        self.snapshots.append(name)
+        return written
+
+    def update(self, snapshot_path=None):
+        """Build packs for a freshly saved snapshot plus any completed ones not yet packed."""
+        # Start from whatever another writer last saved, so its work isn't overwritten
+        self.reload_if_changed()
+        paths = sorted(p for pattern in SNAPSHOT_PATTERNS
+                       for p in glob.glob(os.path.join(self.data_dir, pattern)))
+        if snapshot_path and os.path.basename(snapshot_path) not in map(os.path.basename, paths):
+            paths.append(snapshot_path)
+        packed = set(self.snapshots)
+        new_paths = [p for p in paths if os.path.basename(p) not in packed and is_complete(p)]
+        if not new_paths:
+            return 0
+
+        written = sum(self.add_snapshot(p) for p in new_paths)
+        self.save()
+        return written
+
+    def _topics_in(self, question):
+        """Topics named in a question, found by looking up its words and word n-grams."""
+        if self._topic_keys is None:
+            self._topic_keys = {topic_key(topic): topic for topic in self.topics}
+            self._max_topic_words = max((len(key.split()) for key in self._topic_keys), default=0)
+        words = _WORD_RE.findall(question.lower())
+        found = []
+        for start in range(len(words)):
+            for end in range(start + 1, min(start + self._max_topic_words, len(words)) + 1):
+                topic = self._topic_keys.get(" ".join(words[start:end]))
+                if topic and topic not in found:
+                    found.append(topic)
+        return found
+
+    def _shards_for(self, question, now=None):
+        """Ranked shards for a question, limited to any time period it names.
+
+        A question naming tickers only gets articles about those tickers. Otherwise
+        it gets matching topics, then everything, newest first.
+        """
+        since, until = time_window(question, now)
+        postings = self.index.postings
+        tickers = find_tickers(question, postings)
+        if tickers:
+            shards = [postings[t] for t in tickers]
+        else:
+            shards = [self.topics[t] for t in self._topics_in(question)]
+            shards.append(self.latest)
+        return [slice_postings(shard, since, until) for shard in shards]
+
+    def assemble(self, question, max_tokens, now=None):
+        """Pick pack entries for a question without exceeding `max_tokens`.
+
+        Relative periods such as "this week" are measured from `now` (default: the
+        current time). Returns (context, tokens_used, article_ids).
+        """
+        chosen = []
+        seen = set()
+        used = 0
+        for shard in self._shards_for(question, now):
+            if max_tokens - used < MIN_ENTRY_TOKENS:
+                break
+            for _, aid in reversed(shard):
+                if max_tokens - used < MIN_ENTRY_TOKENS:
+                    break
+                # The ticker index can be ahead of the packs for a moment after a crawl
+                if aid in seen or aid not in self.entries:
+                    continue
+                seen.add(aid)
+                tokens = self.entries[aid]['tokens']
+                if used + tokens > max_tokens:
+                    # Smaller entries further down may still fit
+                    continue
+                chosen.append(aid)
+                used += tokens
+        context = ENTRY_SEPARATOR.join(self.entries[aid]['text'] for aid in chosen)
+        return context, used, chosen
+
+
+_packs = {}
+
+
+def get_packs(data_dir="finance_data"):
+    """Return the process-wide context packs for a data directory, loading them on first use."""
+    if data_dir not in _packs:
+        _packs[data_dir] = ContextPacks(data_dir)
+    return _packs[data_dir]
+
+
+def update_packs(snapshot_path=None, data_dir="finance_data"):
+    """Incrementally build context packs for a saved crawl (or all unpacked crawls)."""
+    try:
+        packs = get_packs(data_dir)
+        written = packs.update(snapshot_path)
+        print(f"Context packs updated: {written} entries")
+        return packs
+    except Exception as e:
+        print(f"Error updating context packs: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Build or catch up the packs (and the ticker index they use) from every saved crawl
+    from ticker_index import update_index
+    update_index()
+    update_packs()
@@ -1,14 +1,21 @@
 import os
-import requests
 import time
 import re
 import json
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 from urllib.parse import urljoin
+from article_stream import ArticleStreamWriter, find_incomplete_stream, iter_articles
+from clients import get_http_session
+from context_packs import update_packs
+from ticker_index import update_index
+
+def make_soup(html):
+    """Parse HTML, importing BeautifulSoup only when a page is actually parsed."""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, 'html.parser')
 
 class YahooFinanceScraper:
-    def __init__(self, output_dir="finance_data", keywords=None):
+    def __init__(self, output_dir="finance_data", keywords=None, stream=False, process_article=None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
@@ -18,10 +25,19 @@ class YahooFinanceScraper:
         self.articles = []
         self.keywords = keywords or []
         self.last_run_file = os.path.join(output_dir, "last_run.txt")
+        # Optional hook to enrich (or drop, by returning None) each article before it is kept
+        self.process_article = process_article
 
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
+        # In streaming mode articles go straight to disk instead of self.articles,
+        # and an interrupted crawl is picked up where it left off. The stream is
+        # only opened when the first article arrives, so skipped runs touch nothing.
+        self.streaming = stream
+        self.stream = None
+        self._resumed_urls = None
+
     def should_run_crawler(self):
         """Check if crawler should run based on last run time."""
         if not os.path.exists(self.last_run_file):
@@ -48,13 +64,13 @@ class YahooFinanceScraper:
 
         print(f"Scraping Yahoo Finance news listings...")
         try:
-            response = requests.get(self.yahoo_url, headers=self.headers)
+            response = get_http_session().get(self.yahoo_url, headers=self.headers)
             if response.status_code == 200:
                 if debug:
                     with open("yahoo_debug.html", "w", encoding="utf-8") as f:
                         f.write(response.text)
 
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = make_soup(response.text)
                 article_links = []
 
                 for article in soup.find_all('a', href=True):
@@ -77,10 +93,13 @@ class YahooFinanceScraper:
                 articles_to_process = unique_articles[:max_articles]
 
                 for i, (title, url) in enumerate(articles_to_process):
+                    if self.is_saved(url):
+                        print(f"Skipping Yahoo article {i+1}/{len(articles_to_process)} (already saved): {title}")
+                        continue
                     print(f"Processing Yahoo article {i+1}/{len(articles_to_process)}: {title}")
                     article_data = self.scrape_article_content(url, title)
                     if article_data:
-                        self.articles.append(article_data)
+                        self.add_article(article_data)
                     time.sleep(2)
             else:
                 print(f"Failed to fetch Yahoo Finance. Status code: {response.status_code}")
@@ -88,9 +107,34 @@ class YahooFinanceScraper:
             print(f"Error scraping Yahoo Finance: {e}")
 
     def get_articles(self):
-        """Return the list of scraped articles."""
+        """Return the list of scraped articles (empty in streaming mode)."""
         return self.articles
 
+    def add_article(self, article_data):
+        """Keep a scraped article, writing it to the stream right away when streaming."""
+        if self.process_article:
+            article_data = self.process_article(article_data)
+            if not article_data:
+                return
+        if self.streaming:
+            if self.stream is None:
+                self.stream = ArticleStreamWriter.resume_or_create(self.output_dir)
+            self.stream.append(article_data)
+        else:
+            self.articles.append(article_data)
+
+    def is_saved(self, url):
+        """True if an interrupted stream already holds this article."""
+        if not self.streaming:
+            return False
+        if self.stream:
+            return self.stream.is_committed(url)
+        if self._resumed_urls is None:
+            # Peek at the stream a resumed crawl would continue, without opening it for writing
+            path = find_incomplete_stream(self.output_dir)
+            self._resumed_urls = {a.get('url') for a in iter_articles(path)} if path else set()
+        return url in self._resumed_urls
+
     def scrape_cnbc(self, max_articles=5, debug=False):
         if not self.should_run_crawler():
             print("Crawler was run recently (within last 6 hours). Skipping...")
@@ -98,13 +142,13 @@ class YahooFinanceScraper:
 
         print(f"Scraping CNBC Finance news listings...")
         try:
-            response = requests.get(self.cnbc_url, headers=self.headers)
+            response = get_http_session().get(self.cnbc_url, headers=self.headers)
             if response.status_code == 200:
                 if debug:
                     with open("cnbc_debug.html", "w", encoding="utf-8") as f:
                         f.write(response.text)
 
-                soup = BeautifulSoup(response.text, 'html.parser')
+                soup = make_soup(response.text)
                 article_links = []
 
                 for article in soup.find_all('a', href=True):
@@ -127,10 +171,13 @@ class YahooFinanceScraper:
                 articles_to_process = unique_articles[:max_articles]
 
                 for i, (title, url) in enumerate(articles_to_process):
+                    if self.is_saved(url):
+                        print(f"Skipping CNBC article {i+1}/{len(articles_to_process)} (already saved): {title}")
+                        continue
                     print(f"Processing CNBC article {i+1}/{len(articles_to_process)}: {title}")
                     article_data = self.scrape_article_content(url, title)
                     if article_data:
-                        self.articles.append(article_data)
+                        self.add_article(article_data)
                     time.sleep(2)
             else:
                 print(f"Failed to fetch CNBC. Status code: {response.status_code}")
@@ -139,12 +186,12 @@ class YahooFinanceScraper:
 
     def scrape_article_content(self, url, title=None):
         try:
-            response = requests.get(url, headers=self.headers)
+            response = get_http_session().get(url, headers=self.headers)
             if response.status_code != 200:
                 print(f"Failed to fetch article at {url}. Status code: {response.status_code}")
                 return None
 
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = make_soup(response.text)
 
             if not title:
                 title_element = soup.find('h1')
@@ -203,6 +250,9 @@ class YahooFinanceScraper:
         return list(set(filtered_tickers))
 
     def save_results(self, output_format="json"):
+        if self.streaming:
+            return self.complete_stream()
+
         if not self.articles:
             print("No articles to save.")
             return None
@@ -216,6 +266,8 @@ class YahooFinanceScraper:
             
             # Update last run time after successful save
             self.update_last_run_time()
+            update_index(json_path, self.output_dir)
+            update_packs(json_path, self.output_dir)
             
             print(f"Articles saved to JSON: {os.path.abspath(json_path)}")
             return json_path
@@ -223,6 +275,36 @@ class YahooFinanceScraper:
             print(f"Error saving results: {e}")
             return None
 
+    def complete_stream(self):
+        """Mark the streamed crawl complete and return its path."""
+        if self.stream is None and self._resumed_urls:
+            # Every article was already in the interrupted stream, so nothing
+            # opened it; finish it now instead of leaving it incomplete forever
+            try:
+                self.stream = ArticleStreamWriter.resume_or_create(self.output_dir)
+            except Exception as e:
+                print(f"Error resuming stream: {e}")
+                return None
+
+        if not self.stream or not self.stream.count:
+            if self.stream:
+                # Leave the empty stream unmarked so the next run reuses it
+                self.stream.close()
+            print("No articles to save.")
+            return None
+
+        try:
+            self.stream.complete()
+            self.update_last_run_time()
+            update_index(self.stream.path, self.output_dir)
+            update_packs(self.stream.path, self.output_dir)
+
+            print(f"Articles streamed to JSONL: {os.path.abspath(self.stream.path)}")
+            return self.stream.path
+        except Exception as e:
+            print(f"Error completing stream: {e}")
+            return None
+
 
 if __name__ == "__main__":
     scraper = YahooFinanceScraper(keywords=["stock", "market", "ETF", "fund"])
@@ -1,17 +1,9 @@
-import os
-from openai import OpenAI
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from clients import get_openai_client
 
 def extract_keywords(content):
     """Use OpenAI GPT to extract relevant keywords from article content."""
     try:
-        response = client.chat.completions.create(
+        response = get_openai_client().chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": "You are a financial news analyst. Extract key information from the given article."},
@@ -38,7 +30,7 @@ Sentiment: [sentiment]"""}
 def summarize_article(content):
     """Use OpenAI GPT to summarize the article."""
     try:
-        response = client.chat.completions.create(
+        response = get_openai_client().chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": "You are a financial news summarizer. Provide concise summaries of financial articles."},
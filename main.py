@@ -1,12 +1,14 @@
 import json
 import os
+import sys
+from clients import load_env
 from crawler import YahooFinanceScraper
 from keyword_extract import extract_keywords, summarize_article
-from dotenv import load_dotenv
+from worker import run_in_worker
 
 def main():
     # Load environment variables
-    load_dotenv()
+    load_env()
     if not os.getenv("OPENAI_API_KEY"):
         print("⚠️ OPENAI_API_KEY not found in environment variables. Please check your .env file.")
         return
@@ -78,4 +80,6 @@ def main():
         print(f"⚠️ An unexpected error occurred: {str(e)}")
 
 if __name__ == "__main__":
-    main()
+    # Reuse a warm `scheduler.py --worker` process when one is running
+    if "--local" in sys.argv or not run_in_worker("main"):
+        main()
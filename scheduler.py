@@ -1,38 +1,59 @@
+import argparse
 import schedule
 import time
 from crawler import YahooFinanceScraper
 from keyword_extract import extract_keywords, summarize_article
+from context_packs import update_packs
+from ticker_index import update_index
 import json
 import os
 from datetime import datetime
 
+def process_article(article):
+    """Add summary and keywords to one article. Returns None if it can't be enriched."""
+    content = article.get("content", "")
+    if not content:
+        return None
+
+    try:
+        # Get summary and keywords
+        summary = summarize_article(content)
+        keywords = extract_keywords(content)
+
+        if summary and keywords:
+            article.update({
+                "summary": summary,
+                "keywords": keywords
+            })
+            return article
+    except Exception as e:
+        print(f"Error processing article: {e}")
+    return None
+
 def process_articles(articles):
     """Process articles with keyword extraction and summarization."""
     processed_articles = []
     for article in articles:
-        content = article.get("content", "")
-        if not content:
-            continue
-            
-        try:
-            # Get summary and keywords
-            summary = summarize_article(content)
-            keywords = extract_keywords(content)
-            
-            if summary and keywords:
-                article.update({
-                    "summary": summary,
-                    "keywords": keywords
-                })
-                processed_articles.append(article)
-        except Exception as e:
-            print(f"Error processing article: {e}")
-            continue
-            
+        processed = process_article(article)
+        if processed:
+            processed_articles.append(processed)
     return processed_articles
 
-def run_crawler():
+def run_crawler(stream=True):
     print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Starting scheduled crawl...")
+
+    if stream:
+        # Each article is enriched and appended to a JSONL stream as soon as it is
+        # scraped, so memory stays flat and a crash loses at most the current article
+        scraper = YahooFinanceScraper(keywords=["stock", "market"], stream=True, process_article=process_article)
+        scraper.scrape_yahoo_finance(max_articles=5)
+        scraper.scrape_cnbc(max_articles=5)
+        json_path = scraper.save_results()
+        if json_path:
+            print(f"Processed results saved to: {json_path}")
+        else:
+            print("No articles to process")
+        return
     
     # Initialize and run the scraper
     scraper = YahooFinanceScraper(keywords=["stock", "market"])
@@ -52,20 +73,46 @@ def run_crawler():
             with open(json_path, 'w', encoding='utf-8') as f:
                 json.dump(processed_articles, f, ensure_ascii=False, indent=4)
             print(f"Processed results saved to: {json_path}")
+            update_index(json_path)
+            update_packs(json_path)
         except Exception as e:
             print(f"Error saving processed results: {e}")
     else:
         print("No articles to process")
 
 def main():
+    parser = argparse.ArgumentParser(description="Run the finance news crawler every 6 hours.")
+    parser.add_argument("--worker", action="store_true",
+                        help="also serve crawl and main.py jobs from this warm process")
+    parser.add_argument("--no-stream", action="store_true",
+                        help="keep articles in memory and write a single JSON file at the end")
+    parser.add_argument("--once", action="store_true",
+                        help="run one crawl (in the worker if one is running) and exit")
+    args = parser.parse_args()
+
+    crawl = lambda: run_crawler(stream=not args.no_stream)
+    if args.once:
+        import worker
+        if not worker.run_in_worker("crawl"):
+            crawl()
+        return
+
     print("Starting scheduler...")
     print("Crawler will run every 6 hours")
+
+    crawl_job = crawl
+    if args.worker:
+        import worker
+        from main import main as run_main
+        worker.start_in_background({"crawl": crawl, "main": run_main})
+        # Scheduled crawls share the warm session with worker jobs, so serialize them
+        crawl_job = lambda: worker.run_job(crawl)
     
     # Schedule the job to run every 6 hours
-    schedule.every(6).hours.do(run_crawler)
+    schedule.every(6).hours.do(crawl_job)
     
     # Run immediately on startup
-    run_crawler()
+    crawl_job()
     
     # Keep the script running
     while True:
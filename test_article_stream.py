@@ -0,0 +1,127 @@
+import json
+import os
+
+import pytest
+
+from article_stream import (COMPLETE_KEY, ArticleStreamWriter, StreamLockedError, fcntl, is_complete,
+                            load_articles, tail)
+
+
+def article(n):
+    return {'title': f"Article {n}", 'url': f"https://example.com/{n}"}
+
+
+def write_lines(path, records, torn=None):
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+        if torn:
+            f.write(torn)
+
+
+def test_round_trip(tmp_path):
+    writer = ArticleStreamWriter.resume_or_create(str(tmp_path))
+    for n in range(3):
+        writer.append(article(n))
+    writer.complete()
+
+    assert is_complete(writer.path)
+    assert load_articles(writer.path) == [article(n) for n in range(3)]
+
+
+def test_torn_last_line_is_dropped(tmp_path):
+    path = str(tmp_path / "finance_articles_20250101_000000.jsonl")
+    write_lines(path, [article(0), article(1)], torn='{"title": "Article 2", "url": "https://exa')
+
+    assert load_articles(path) == [article(0), article(1)]
+    assert not is_complete(path)
+
+    writer = ArticleStreamWriter(path)
+    writer.append(article(2))
+    writer.complete()
+    assert load_articles(path) == [article(0), article(1), article(2)]
+
+
+def test_resume_continues_after_last_committed_article(tmp_path):
+    path = str(tmp_path / "finance_articles_20250101_000000.jsonl")
+    write_lines(path, [article(0), article(1)], torn='{"tit')
+
+    writer = ArticleStreamWriter.resume_or_create(str(tmp_path))
+    assert writer.path == path
+    assert writer.count == 2
+    assert writer.is_committed(article(1)['url'])
+    assert not writer.is_committed(article(2)['url'])
+    writer.append(article(2))
+    writer.complete()
+
+    marker = json.loads(open(path, encoding='utf-8').read().splitlines()[-1])
+    assert marker[COMPLETE_KEY] and marker['articles'] == 3
+    assert load_articles(path) == [article(0), article(1), article(2)]
+
+
+def test_complete_stream_is_not_reopened(tmp_path):
+    path = str(tmp_path / "finance_articles_20250101_000000.jsonl")
+    write_lines(path, [article(0), {COMPLETE_KEY: True, 'articles': 1}])
+
+    with pytest.raises(ValueError):
+        ArticleStreamWriter(path)
+    writer = ArticleStreamWriter.resume_or_create(str(tmp_path))
+    assert writer.path != path
+    writer.close()
+
+
+@pytest.mark.skipif(fcntl is None, reason="streams are only locked where fcntl is available")
+def test_resume_or_create_skips_locked_stream(tmp_path):
+    path = str(tmp_path / "finance_articles_20250101_000000.jsonl")
+    write_lines(path, [article(0)])
+
+    first = ArticleStreamWriter.resume_or_create(str(tmp_path))
+    assert first.path == path
+    with pytest.raises(StreamLockedError):
+        ArticleStreamWriter(path)
+
+    second = ArticleStreamWriter.resume_or_create(str(tmp_path))
+    assert second.path != path
+    assert second.count == 0
+    second.close()
+    first.close()
+
+
+def test_is_complete_reads_only_the_tail(tmp_path):
+    path = str(tmp_path / "finance_articles_20250101_000000.jsonl")
+    # Much larger than the window is_complete reads
+    big = {'title': "Big", 'url': "https://example.com/big", 'content': "x" * 20000}
+    write_lines(path, [big, article(0)])
+    assert not is_complete(path)
+
+    write_lines(path, [big, article(0), {COMPLETE_KEY: True, 'articles': 2}])
+    assert is_complete(path)
+
+    # A marker that was cut off mid-write doesn't count
+    write_lines(path, [big, article(0)], torn='{"%s": true' % COMPLETE_KEY)
+    assert not is_complete(path)
+
+    assert is_complete(str(tmp_path / "finance_articles_20250101_000000.json"))
+    assert not is_complete(str(tmp_path / "missing.jsonl"))
+
+
+def test_tail_follows_resume_after_truncation(tmp_path):
+    path = str(tmp_path / "finance_articles_20250101_000000.jsonl")
+    write_lines(path, [article(0)], torn='{"title": "Article 1", "url": "https://example.com/1", "content": "cut')
+
+    follower = tail(path, poll_interval=0.01, timeout=1)
+    assert next(follower) == article(0)
+
+    # The resumed writer drops the torn line and writes past where the reader stopped
+    writer = ArticleStreamWriter(path)
+    writer.append(dict(article(1), content="y" * 500))
+    writer.append(article(2))
+    writer.complete()
+
+    assert list(follower) == [dict(article(1), content="y" * 500), article(2)]
+
+
+def test_tail_waits_for_the_file(tmp_path):
+    path = str(tmp_path / "finance_articles_20250101_000000.jsonl")
+    assert list(tail(path, poll_interval=0.01, timeout=0.05)) == []
+    assert not os.path.exists(path)
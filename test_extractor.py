@@ -2,9 +2,10 @@
 
 from keyword_extract import extract_keywords
 
-query = "How is the Indian stock market reacting to the recent global interest rate changes?"
-keywords = extract_keywords(query)
+if __name__ == "__main__":
+    query = "How is the Indian stock market reacting to the recent global interest rate changes?"
+    keywords = extract_keywords(query)
 
-print("Extracted Keywords:")
-for kw in keywords:
-    print("-", kw)
+    print("Extracted Keywords:")
+    for kw in keywords:
+        print("-", kw)
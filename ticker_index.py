@@ -0,0 +1,331 @@
+import glob
+import hashlib
+import json
+import os
+import re
+import tempfile
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from article_stream import completion_marker, is_complete, load_articles
+
+INDEX_FILENAME = "ticker_index.json"
+SNAPSHOT_PATTERNS = ("finance_articles_*.json", "finance_articles_*.jsonl")
+SNAPSHOT_TIME_FORMAT = "%Y%m%d_%H%M%S"
+
+# Words that look like symbols in a question but almost never mean one.
+# Finance acronyms are here too: extract_tickers indexes e.g. "(ETF)" as a ticker.
+QUERY_STOPWORDS = {
+    'A', 'I', 'AM', 'PM', 'CEO', 'CFO', 'CTO', 'COO', 'THE', 'FOR', 'ON', 'BY', 'US', 'IT', 'IS', 'OR', 'AND',
+    'WHY', 'HOW', 'WHAT', 'ETF', 'ETFS', 'NYSE', 'NASDAQ', 'ESG', 'EBIT', 'EBITDA', 'EPS', 'IPO', 'GDP', 'CPI',
+    'PPI', 'PCE', 'FED', 'FOMC', 'SEC', 'AI', 'USD', 'EUR', 'YOY', 'QOQ', 'AUM', 'ROI', 'ROE', 'PE',
+}
+
+
+def find_tickers(text, known):
+    """Symbols from `known` named in free text, in order of first mention."""
+    found = []
+    for match in re.finditer(r'\$?\b([A-Za-z]{1,5}(?:\.[A-Za-z]{1,2})?)\b', text):
+        token = match.group(0)
+        symbol = match.group(1).upper()
+        explicit = token.startswith('$')
+        # Without a '$' only trust all-caps words of two letters or more
+        if not explicit and (match.group(1) != symbol or len(symbol) < 2 or symbol in QUERY_STOPWORDS):
+            continue
+        if symbol in known and symbol not in found:
+            found.append(symbol)
+    return found
+
+
+def time_window(text, now=None):
+    """(since, until) bounds for a relative period named in free text, as naive UTC strings.
+
+    Understands today, yesterday, this/last week, this month and past/last N
+    hours/days/weeks. Calendar periods follow local time; `now` defaults to the
+    current time. Returns (None, None) when no period is named.
+    """
+    now = (now or datetime.now()).astimezone()
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    lowered = text.lower()
+    since, until = None, None
+    match = re.search(r'\b(?:past|last)\s+(\d+)\s+(hour|day|week)s?\b', lowered)
+    if match:
+        since = now - timedelta(**{match.group(2) + 's': int(match.group(1))})
+    elif re.search(r'\btoday\b', lowered):
+        since = midnight
+    elif re.search(r'\byesterday\b', lowered):
+        since, until = midnight - timedelta(days=1), midnight
+    elif re.search(r'\bthis week\b', lowered):
+        since = midnight - timedelta(days=now.weekday())
+    elif re.search(r'\blast week\b', lowered):
+        until = midnight - timedelta(days=now.weekday())
+        since = until - timedelta(weeks=1)
+    elif re.search(r'\bthis month\b', lowered):
+        since = midnight.replace(day=1)
+    return tuple(normalize_timestamp(bound.isoformat()) if bound else None for bound in (since, until))
+
+
+def slice_postings(postings, since=None, until=None):
+    """The part of a sorted [[timestamp, article_id], ...] list within the optional bounds."""
+    start = bisect_left(postings, [since]) if since else 0
+    # '~' sorts after any article ID, so postings at exactly `until` are included
+    end = bisect_right(postings, [until, '~']) if until else len(postings)
+    return postings[start:end]
+
+
+def article_id(url):
+    """Stable ID for an article, derived from its URL so re-crawls map to the same entry."""
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()[:12]
+
+
+def normalize_timestamp(value):
+    """Return a sortable 'YYYY-MM-DDTHH:MM:SS' string, or None if the value can't be parsed."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    # Naive values are taken as UTC; everything is stored as naive UTC
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.isoformat(timespec='seconds')
+
+
+def snapshot_timestamp(path):
+    """Crawl time of a snapshot, as naive UTC.
+
+    Streams use the completion time from their marker, since a resumed stream
+    keeps the filename of the crawl that was interrupted. Otherwise the time is
+    taken from the finance_articles_<timestamp> filename, which uses local time.
+    """
+    if path.endswith(".jsonl"):
+        marker = completion_marker(path)
+        completed = normalize_timestamp(marker.get('completed_at')) if marker else None
+        if completed:
+            return completed
+    stem = os.path.splitext(os.path.basename(path))[0]
+    try:
+        crawled = datetime.strptime(stem[len("finance_articles_"):][:15], SNAPSHOT_TIME_FORMAT).astimezone(timezone.utc)
+    except ValueError:
+        crawled = datetime.fromtimestamp(os.path.getmtime(path), timezone.utc)
+    return crawled.replace(tzinfo=None).isoformat(timespec='seconds')
+
+
+def save_json_atomic(path, data):
+    """Write JSON through a unique temp file and rename it into place.
+
+    Concurrent writers never share a temp file, so readers only ever see a complete file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class TickerIndex:
+    """Inverted index from ticker symbol to the articles that mention it.
+
+    Postings are kept sorted by article time (published date when available,
+    otherwise crawl time), so timeline and count queries are a bisect away.
+    The index is persisted next to the snapshots and updated incrementally.
+    """
+
+    def __init__(self, data_dir="finance_data"):
+        self.data_dir = data_dir
+        self.index_path = os.path.join(data_dir, INDEX_FILENAME)
+        self.postings = {}   # ticker -> sorted [[timestamp, article_id], ...]
+        self.articles = {}   # article_id -> metadata incl. snapshot location
+        self.snapshots = []  # snapshot filenames already indexed
+        self._snapshot_cache = {}
+        self._mtime = None
+        self.load()
+
+    def load(self):
+        """Load the persisted index, starting empty if it is missing or unreadable."""
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            self._mtime = os.path.getmtime(self.index_path)
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.postings = data.get('postings', {})
+            self.articles = data.get('articles', {})
+            self.snapshots = data.get('snapshots', [])
+        except Exception as e:
+            print(f"Error loading ticker index, rebuilding: {e}")
+            self.postings, self.articles, self.snapshots = {}, {}, []
+
+    def reload_if_changed(self):
+        """Reload the index if another process saved it since it was loaded.
+
+        This is how read-only users such as the app pick up new crawls.
+        """
+        try:
+            mtime = os.path.getmtime(self.index_path)
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        self.load()
+        self._snapshot_cache = {}
+        return True
+
+    def save(self):
+        """Persist the index atomically so readers never see a half-written file."""
+        try:
+            save_json_atomic(self.index_path, {
+                'snapshots': self.snapshots,
+                'articles': self.articles,
+                'postings': self.postings,
+            })
+            self._mtime = os.path.getmtime(self.index_path)
+        except Exception as e:
+            print(f"Error saving ticker index: {e}")
+
+    def add_snapshot(self, path):
+        """Index every article in one crawl snapshot. Returns the number of new postings."""
+        name = os.path.basename(path)
+        if name in self.snapshots:
+            return 0
+
+        try:
+            articles = load_articles(path)
+        except Exception as e:
+            print(f"Error indexing {path}: {e}")
+            return 0
+
+        crawled_at = snapshot_timestamp(path)
+        added = 0
+        for position, article in enumerate(articles or []):
+            url = article.get('url')
+            if not url:
+                continue
+            aid = article_id(url)
+            entry = self.articles.get(aid)
+            if entry is None:
+                entry = {
+                    'title': article.get('title', ''),
+                    'url': url,
+                    'timestamp': normalize_timestamp(article.get('published_date')) or crawled_at,
+                    'tickers': [],
+                }
+                self.articles[aid] = entry
+            # Always point at the newest copy, which may carry summary/keywords
+            entry['snapshot'] = name
+            entry['position'] = position
+
+            for ticker in article.get('mentioned_tickers') or []:
+                if ticker in entry['tickers']:
+                    continue
+                entry['tickers'].append(ticker)
+                insort(self.postings.setdefault(ticker, []), [entry['timestamp'], aid])
+                added += 1
+
+        self.snapshots.append(name)
+        self._snapshot_cache.pop(name, None)
+        return added
+
+    def update(self, snapshot_path=None):
+        """Index a freshly saved snapshot plus any historical ones not yet indexed, and persist."""
+        # Start from whatever another writer last saved, so its work isn't overwritten
+        self.reload_if_changed()
+        paths = sorted(p for pattern in SNAPSHOT_PATTERNS
+                       for p in glob.glob(os.path.join(self.data_dir, pattern)))
+        if snapshot_path and os.path.basename(snapshot_path) not in map(os.path.basename, paths):
+            paths.append(snapshot_path)
+        indexed = set(self.snapshots)
+        # Streams still being written are picked up once their crawl completes
+        new_paths = [p for p in paths if os.path.basename(p) not in indexed and is_complete(p)]
+        if not new_paths:
+            return 0
+
+        added = sum(self.add_snapshot(p) for p in new_paths)
+        self.save()
+        return added
+
+    def _range(self, ticker, since=None, until=None):
+        return slice_postings(self.postings.get(ticker.upper(), []), since, until)
+
+    def timeline(self, ticker, since=None, until=None, limit=None):
+        """Articles mentioning a ticker, newest first. Bounds are ISO timestamp strings (naive means UTC)."""
+        postings = self._range(ticker, normalize_timestamp(since), normalize_timestamp(until))
+        results = []
+        for timestamp, aid in reversed(postings):
+            entry = self.articles[aid]
+            results.append({
+                'id': aid,
+                'timestamp': timestamp,
+                'title': entry['title'],
+                'url': entry['url'],
+            })
+            if limit and len(results) >= limit:
+                break
+        return results
+
+    def mention_count(self, ticker, since=None, until=None):
+        """Number of articles mentioning a ticker within the optional time window."""
+        return len(self._range(ticker, normalize_timestamp(since), normalize_timestamp(until)))
+
+    def co_mentioned(self, ticker, top_n=5, since=None, until=None):
+        """Tickers most often mentioned alongside the given one, as (ticker, count) pairs."""
+        ticker = ticker.upper()
+        counts = Counter()
+        for _, aid in self._range(ticker, normalize_timestamp(since), normalize_timestamp(until)):
+            counts.update(t for t in self.articles[aid]['tickers'] if t != ticker)
+        return counts.most_common(top_n)
+
+    def tickers_in_text(self, text):
+        """Known tickers named in free text, e.g. 'TXN' or '$TXN' in a user question."""
+        return find_tickers(text, self.postings)
+
+    def get_articles(self, article_ids):
+        """Load full article records for the given IDs from their snapshots."""
+        results = []
+        for aid in article_ids:
+            entry = self.articles.get(aid)
+            if not entry:
+                continue
+            name = entry['snapshot']
+            if name not in self._snapshot_cache:
+                try:
+                    self._snapshot_cache[name] = load_articles(os.path.join(self.data_dir, name))
+                except Exception as e:
+                    print(f"Error loading snapshot {name}: {e}")
+                    self._snapshot_cache[name] = []
+            snapshot = self._snapshot_cache[name]
+            if entry['position'] < len(snapshot):
+                results.append(snapshot[entry['position']])
+        return results
+
+
+_indexes = {}
+
+
+def get_index(data_dir="finance_data"):
+    """Return the process-wide index for a data directory, loading it on first use."""
+    if data_dir not in _indexes:
+        _indexes[data_dir] = TickerIndex(data_dir)
+    return _indexes[data_dir]
+
+
+def update_index(snapshot_path=None, data_dir="finance_data"):
+    """Incrementally add a saved crawl (or all unindexed crawls) to the ticker index."""
+    try:
+        index = get_index(data_dir)
+        added = index.update(snapshot_path)
+        print(f"Ticker index updated: {added} new postings")
+        return index
+    except Exception as e:
+        print(f"Error updating ticker index: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    # Build or catch up the index from every saved crawl
+    update_index()
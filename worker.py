@@ -0,0 +1,225 @@
+import os
+import secrets
+import sys
+import threading
+import traceback
+
+# A resident worker keeps the HTTP session, OpenAI client, parsers and ticker
+# index warm in one long-lived process (started with `python scheduler.py --worker`).
+# One-off commands such as `python main.py` hand their job to it when it is running.
+#
+# The protocol only exchanges raw UTF-8 bytes, so nothing received is ever
+# unpickled: the client sends a job name, the worker streams output messages
+# (OUTPUT + text) and finishes with one status message (STATUS + JOB_*).
+WORKER_ADDRESS = ("localhost", int(os.getenv("FINANCE_WORKER_PORT", "6061")))
+# Used unless FINANCE_WORKER_AUTHKEY is set; created by the worker, readable only by its owner
+WORKER_KEY_FILE = os.path.join("finance_data", ".worker_key")
+CONNECT_TIMEOUT = 5
+# How long an authenticated client has to send its job name
+REQUEST_TIMEOUT = 5
+
+OUTPUT = b'O'
+STATUS = b'S'
+JOB_OK = 'ok'
+JOB_FAILED = 'failed'
+JOB_UNKNOWN = 'unknown'
+
+# Jobs share the scraper session, so only one runs at a time
+job_lock = threading.Lock()
+
+
+def load_authkey(create=False):
+    """Worker auth key from FINANCE_WORKER_AUTHKEY or the key file, optionally creating the file.
+
+    Returns None when there is no key, i.e. no worker has ever been started.
+    """
+    env_key = os.getenv("FINANCE_WORKER_AUTHKEY")
+    if env_key:
+        return env_key.encode()
+    try:
+        with open(WORKER_KEY_FILE, 'rb') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        if not create:
+            return None
+
+    os.makedirs(os.path.dirname(WORKER_KEY_FILE), exist_ok=True)
+    key = secrets.token_hex(32).encode()
+    try:
+        fd = os.open(WORKER_KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Another worker created it first
+        return load_authkey()
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key)
+    return key
+
+
+class _JobOutput:
+    """sys.stdout replacement that streams a job thread's prints to its client.
+
+    Other threads (the scheduler loop, scheduled crawls) keep writing to the real stdout.
+    """
+
+    def __init__(self, stdout):
+        self._stdout = stdout
+        self._local = threading.local()
+
+    def attach(self, conn):
+        self._local.conn = conn
+
+    def detach(self):
+        self._local.conn = None
+
+    def write(self, text):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or not text:
+            return self._stdout.write(text)
+        try:
+            conn.send_bytes(OUTPUT + text.encode('utf-8'))
+        except OSError:
+            # Client went away; let the job finish and log locally
+            self._local.conn = None
+            self._stdout.write(text)
+        return len(text)
+
+    def flush(self):
+        self._stdout.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stdout, name)
+
+
+def run_job(job):
+    """Run a job under the worker lock, printing straight to the current stdout.
+
+    Returns True if the job finished without raising.
+    """
+    with job_lock:
+        try:
+            job()
+            return True
+        except Exception:
+            traceback.print_exc(file=sys.stdout)
+            return False
+
+
+def _handle(conn, jobs, output, authkey):
+    """Authenticate one client, run the job it names and report the outcome."""
+    from multiprocessing.connection import answer_challenge, deliver_challenge
+    with conn:
+        try:
+            # Same handshake Listener.accept() does, but in this connection's own
+            # thread so a stalled client can't hold up anyone else
+            deliver_challenge(conn, authkey)
+            answer_challenge(conn, authkey)
+            if not conn.poll(REQUEST_TIMEOUT):
+                return
+            name = conn.recv_bytes().decode('utf-8', errors='replace')
+        except Exception as e:
+            print(f"Worker connection error: {e}")
+            return
+
+        job = jobs.get(name)
+        output.attach(conn)
+        try:
+            if job is None:
+                print(f"⚠️ Unknown worker job: {name}")
+                status = JOB_UNKNOWN
+            else:
+                status = JOB_OK if run_job(job) else JOB_FAILED
+        finally:
+            output.detach()
+        try:
+            conn.send_bytes(STATUS + status.encode('utf-8'))
+        except OSError:
+            pass
+
+
+def serve(jobs):
+    """Accept job requests forever. `jobs` maps a job name to a no-argument callable.
+
+    Each connection is handled in its own thread; job_lock still runs one job at a time.
+    """
+    from multiprocessing.connection import Listener
+    authkey = load_authkey(create=True)
+    output = _JobOutput(sys.stdout)
+    sys.stdout = output
+    # No authkey here: _handle authenticates inside the connection's thread
+    with Listener(WORKER_ADDRESS) as listener:
+        print(f"Worker listening on {WORKER_ADDRESS[0]}:{WORKER_ADDRESS[1]}")
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                print(f"Worker connection error: {e}")
+                continue
+            threading.Thread(target=_handle, args=(conn, jobs, output, authkey), daemon=True).start()
+
+
+def start_in_background(jobs):
+    """Serve worker requests from a daemon thread alongside the scheduler loop."""
+    thread = threading.Thread(target=serve, args=(jobs,), daemon=True)
+    thread.start()
+    return thread
+
+
+def _connect(authkey, timeout):
+    """Open an authenticated connection, giving up if the handshake takes longer than `timeout`."""
+    from multiprocessing.connection import Client
+    result = {}
+
+    def connect():
+        try:
+            result['conn'] = Client(WORKER_ADDRESS, authkey=authkey)
+        except Exception as e:
+            result['error'] = e
+
+    thread = threading.Thread(target=connect, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise TimeoutError(f"no handshake from {WORKER_ADDRESS[0]}:{WORKER_ADDRESS[1]} within {timeout}s")
+    if 'error' in result:
+        raise result['error']
+    return result['conn']
+
+
+def run_in_worker(name):
+    """Run a job in the resident worker, printing its output as it arrives.
+
+    Returns True only if the worker ran the job successfully. On False (no
+    usable worker, unknown job, or the job failed) the caller should run it itself.
+    """
+    from multiprocessing import AuthenticationError
+    authkey = load_authkey()
+    if authkey is None:
+        return False
+    try:
+        conn = _connect(authkey, CONNECT_TIMEOUT)
+    except ConnectionRefusedError:
+        return False
+    except (OSError, EOFError, AuthenticationError) as e:
+        print(f"⚠️ Worker unavailable ({e}), running locally")
+        return False
+
+    with conn:
+        try:
+            conn.send_bytes(name.encode('utf-8'))
+        except OSError as e:
+            print(f"⚠️ Worker unavailable ({e}), running locally")
+            return False
+        while True:
+            try:
+                message = conn.recv_bytes()
+            except (EOFError, OSError):
+                print("⚠️ Worker connection closed before the job finished, running locally")
+                return False
+            kind, body = message[:1], message[1:].decode('utf-8', errors='replace')
+            if kind == OUTPUT:
+                sys.stdout.write(body)
+                sys.stdout.flush()
+            elif kind == STATUS:
+                if body != JOB_OK:
+                    print(f"⚠️ Worker job '{name}' {body}, running locally")
+                return body == JOB_OK